@@ -1,7 +1,12 @@
 import streamlit as st
 import requests
+import orjson
+import gzip
+import hashlib
+import io
 import json
 import os
+import threading
 from datetime import datetime
 
 # Configure page
@@ -14,36 +19,137 @@ st.set_page_config(
 # API base URL
 API_BASE = "http://localhost:8000"
 
+# Seconds between background /status polls
+STATUS_POLL_INTERVAL = 30
+
+# JSON request bodies at least this large are sent gzipped
+GZIP_MIN_BODY = 1024
+
+def _json(response: requests.Response):
+    """Parse a JSON response body with orjson (C parser) instead of the stdlib"""
+    return orjson.loads(response.content)
+
+# One keep-alive session shared across reruns, so clicks reuse the connection
+@st.cache_resource
+def api_session() -> requests.Session:
+    session = requests.Session()
+    # Streamlit serves each browser session on its own thread; size the pool for that
+    adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def post_json(path: str, payload: dict, **kwargs) -> requests.Response:
+    """POST a JSON payload to the API, gzip-compressed when large enough to benefit"""
+    body = orjson.dumps(payload)
+    headers = {"Content-Type": "application/json"}
+    if len(body) >= GZIP_MIN_BODY:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return api_session().post(f"{API_BASE}{path}", data=body, headers=headers, **kwargs)
+
+# /status is polled on a daemon thread shared by all browser sessions; the
+# sidebar renders the last known result and never waits on the API
+@st.cache_resource
+def status_poller() -> dict:
+    state = {"status": None, "etag": None, "error": None, "refresh": threading.Event()}
+    session = api_session()
+    
+    def poll():
+        while True:
+            try:
+                # An unchanged status comes back as an empty 304
+                headers = {"If-None-Match": state["etag"]} if state["etag"] else {}
+                response = session.get(f"{API_BASE}/status", headers=headers, timeout=5)
+                if response.status_code != 304:
+                    response.raise_for_status()
+                    state["status"], state["etag"] = _json(response), response.headers.get("ETag")
+                state["error"] = None
+            except requests.HTTPError:
+                state["error"] = "api_error"
+            except Exception:
+                state["error"] = "unavailable"
+            state["refresh"].wait(STATUS_POLL_INTERVAL)
+            state["refresh"].clear()
+    
+    threading.Thread(target=poll, name="status-poller", daemon=True).start()
+    return state
+
+# Match and optimize results are memoized per (resume, job description), so
+# reruns and repeated clicks skip the API and Watson round-trip. The cache is
+# shared by every session in this process, so entries expire and are capped.
+# Failed calls raise and are not cached.
+FETCH_CACHE_TTL = 3600  # seconds
+FETCH_CACHE_MAX_ENTRIES = 128
+
+class _Uncacheable(Exception):
+    """Carries a result out of a cached function without memoizing it"""
+    def __init__(self, result: dict):
+        super().__init__()
+        self.result = result
+
+@st.cache_data(show_spinner=False, ttl=FETCH_CACHE_TTL, max_entries=FETCH_CACHE_MAX_ENTRIES)
+def fetch_match(resume: str, job_description: str) -> dict:
+    response = post_json("/match", {"resume": resume, "job_description": job_description})
+    response.raise_for_status()
+    return _json(response)
+
+@st.cache_data(show_spinner=False, ttl=FETCH_CACHE_TTL, max_entries=FETCH_CACHE_MAX_ENTRIES)
+def _fetch_analyze_and_optimize(resume: str, job_description: str) -> dict:
+    response = post_json("/analyze-and-optimize", {"resume": resume, "job_description": job_description})
+    response.raise_for_status()
+    result = _json(response)
+    # Like the API, don't keep the local fallback from a Watson failure
+    if result['optimization'].get('ai_model') == 'fallback_mode':
+        raise _Uncacheable(result)
+    return result
+
+def fetch_analyze_and_optimize(resume: str, job_description: str) -> dict:
+    try:
+        return _fetch_analyze_and_optimize(resume, job_description)
+    except _Uncacheable as e:
+        return e.result
+
 # Header
 st.title("🦫 ResumeBeaver")
 st.subheader("AI-Powered Resume Optimization for Job Applications")
 
-# Sidebar for status
-with st.sidebar:
+# Sidebar for status. The poller updates in the background, so the block
+# re-renders on its own schedule to show the latest result.
+@st.fragment(run_every=STATUS_POLL_INTERVAL)
+def status_sidebar():
     st.header("System Status")
-    try:
-        status_response = requests.get(f"{API_BASE}/status", timeout=5)
-        if status_response.status_code == 200:
-            status = status_response.json()
-            st.success("✅ API Connected")
-            st.info(f"🤖 AI: {'Watson' if status['ai_status']['watson_available'] else 'Local'}")
-            
-            # Show new features
-            features = status.get('features', {})
-            if features.get('resume_generation'):
-                st.success("✨ Resume Generation: Enabled")
-            else:
-                st.warning("⚠️ Resume Generation: Not Available")
-        else:
-            st.error("❌ API Error")
-    except:
+    poller = status_poller()
+    if st.button("🔄 Refresh status"):
+        poller["refresh"].set()
+    status, error = poller["status"], poller["error"]
+    if error == "api_error":
+        st.error("❌ API Error")
+    elif error:
         st.error("❌ API Unavailable")
         st.info("Make sure to run: `python main.py`")
+    elif status is None:
+        st.info("⏳ Checking API status...")
+    else:
+        st.success("✅ API Connected")
+        st.info(f"🤖 AI: {'Watson' if status['ai_status']['watson_available'] else 'Local'}")
+        
+        # Show new features
+        features = status.get('features', {})
+        if features.get('resume_generation'):
+            st.success("✨ Resume Generation: Enabled")
+        else:
+            st.warning("⚠️ Resume Generation: Not Available")
+
+with st.sidebar:
+    status_sidebar()
 
-# Main interface with new Resume Generator tab
+# Main interface with new Resume Generator tab. Each tab is a fragment, so a
+# widget interaction reruns only its own tab instead of the whole script.
 tab1, tab2, tab3, tab4 = st.tabs(["📤 Upload Resume", "📝 Text Analysis", "📊 Match Score", "🎯 Resume Generator"])
 
-with tab1:
+@st.fragment
+def upload_tab():
     st.header("Upload Your Resume")
     
     uploaded_file = st.file_uploader(
@@ -53,18 +159,40 @@ with tab1:
     )
     
     if uploaded_file:
+        # Read the upload once; the file object may already be at EOF on a rerun
+        resume_bytes = uploaded_file.getvalue()
+        upload_hash = hashlib.blake2b(resume_bytes, digest_size=16).hexdigest()
+        
         with st.spinner("Processing resume..."):
             try:
-                files = {"file": (uploaded_file.name, uploaded_file, uploaded_file.type)}
-                response = requests.post(f"{API_BASE}/upload", files=files)
+                # Reruns with the same file still selected reuse the last upload result
+                result = None
+                last_hash, last_result = st.session_state.get('last_upload', (None, None))
+                if last_hash == upload_hash:
+                    result = last_result
+                else:
+                    files = {"file": (uploaded_file.name, resume_bytes, uploaded_file.type)}
+                    request = api_session().prepare_request(requests.Request("POST", f"{API_BASE}/upload", files=files))
+                    # Gzip the multipart body when that makes it smaller (TXT and some DOCX exports)
+                    compressed = gzip.compress(request.body, compresslevel=6)
+                    if len(compressed) < len(request.body):
+                        request.body = compressed
+                        request.headers["Content-Encoding"] = "gzip"
+                        request.headers["Content-Length"] = str(len(compressed))
+                    response = api_session().send(request)
+                    
+                    if response.status_code == 200:
+                        result = _json(response)
+                        st.session_state['last_upload'] = (upload_hash, result)
+                        # Other tabs prefill from the upload; rerun the whole app so they see it
+                        st.session_state['uploaded_resume_text'] = result.get('text_preview', '')
+                        st.rerun()
+                    else:
+                        st.error(f"Upload failed: {response.text}")
                 
-                if response.status_code == 200:
-                    result = response.json()
+                if result:
                     st.success("✅ Resume uploaded successfully!")
                     
-                    # Store resume text for later use
-                    st.session_state['uploaded_resume_text'] = result.get('text_preview', '')
-                    
                     # Display analysis
                     col1, col2 = st.columns(2)
                     
@@ -103,20 +231,19 @@ with tab1:
                         
                         if ats.get('issues'):
                             st.warning("⚠️ Issues Found:")
-                            for issue in ats['issues']:
-                                st.write(f"• {issue}")
+                            st.markdown("\n".join(f"- {issue}" for issue in ats['issues']))
                         
                         if ats.get('recommendations'):
                             st.info("💡 Recommendations:")
-                            for rec in ats['recommendations']:
-                                st.write(f"• {rec}")
-                
-                else:
-                    st.error(f"Upload failed: {response.text}")
+                            st.markdown("\n".join(f"- {rec}" for rec in ats['recommendations']))
             except Exception as e:
                 st.error(f"Error: {str(e)}")
 
-with tab2:
+with tab1:
+    upload_tab()
+
+@st.fragment
+def analysis_tab():
     st.header("Manual Text Analysis")
     
     col1, col2 = st.columns(2)
@@ -129,8 +256,9 @@ with tab2:
             placeholder="Enter your resume content...",
             value=st.session_state.get('uploaded_resume_text', '')
         )
-        # Store for other tabs
-        if resume_text:
+        # Store for other tabs; they only re-render on a full app rerun
+        text_changed = bool(resume_text) and resume_text != st.session_state.get('resume_text')
+        if text_changed:
             st.session_state['resume_text'] = resume_text
     
     with col2:
@@ -140,23 +268,24 @@ with tab2:
             height=300,
             placeholder="Enter job requirements..."
         )
-        # Store for other tabs
-        if job_text:
+        if job_text and job_text != st.session_state.get('job_description'):
             st.session_state['job_description'] = job_text
+            text_changed = True
     
-    if st.button("🔍 Analyze", type="primary"):
+    analyze_clicked = st.button("🔍 Analyze", type="primary")
+    if text_changed:
+        # The full rerun resets the button, so carry a click over to it
+        st.session_state['analyze_requested'] = analyze_clicked
+        st.rerun()
+    
+    if analyze_clicked or st.session_state.pop('analyze_requested', False):
         if resume_text and job_text:
             with st.spinner("Analyzing..."):
                 try:
                     # Get match score
-                    match_data = {
-                        "resume": resume_text,
-                        "job_description": job_text
-                    }
-                    match_response = requests.post(f"{API_BASE}/match", json=match_data)
+                    match_result = fetch_match(resume_text, job_text)['match_analysis']
                     
-                    if match_response.status_code == 200:
-                        match_result = match_response.json()['match_analysis']
+                    if match_result:
                         
                         # Display match scores
                         st.subheader("📊 Match Analysis")
@@ -194,7 +323,11 @@ with tab2:
         else:
             st.warning("Please enter both resume and job description text.")
 
-with tab3:
+with tab2:
+    analysis_tab()
+
+@st.fragment
+def optimization_tab():
     st.header("🚀 Resume Optimization")
     
     col1, col2 = st.columns(2)
@@ -219,14 +352,16 @@ with tab3:
         if resume_opt_text and job_opt_text:
             with st.spinner("Generating optimization suggestions..."):
                 try:
-                    opt_data = {
-                        "resume": resume_opt_text,
-                        "job_description": job_opt_text
-                    }
-                    opt_response = requests.post(f"{API_BASE}/optimize", json=opt_data)
+                    # One request covers the ATS analysis and the optimization
+                    opt_json = fetch_analyze_and_optimize(resume_opt_text, job_opt_text)
+                    opt_result = opt_json['optimization']
                     
-                    if opt_response.status_code == 200:
-                        opt_result = opt_response.json()['optimization']
+                    if opt_result:
+                        
+                        # ATS score from the resume analysis
+                        ats = opt_json['analysis'].get('ats_score', {})
+                        if ats:
+                            st.metric("🎯 ATS Score", f"{ats['score']}/100")
                         
                         # AI-powered suggestions
                         if opt_result.get('ai_powered') and opt_result.get('ai_suggestions'):
@@ -257,8 +392,12 @@ with tab3:
         else:
             st.warning("Please enter both resume and job description.")
 
+with tab3:
+    optimization_tab()
+
 # NEW TAB: Resume Generator
-with tab4:
+@st.fragment
+def generator_tab():
     st.header("🎯 AI Resume Generator")
     st.write("Generate an optimized resume with automatic improvements applied!")
     
@@ -305,16 +444,16 @@ with tab4:
             if input_resume and target_job:
                 with st.spinner("Generating preview..."):
                     try:
-                        response = requests.post(
-                            f"{API_BASE}/preview",
-                            json={
+                        response = post_json(
+                            "/preview",
+                            {
                                 "resume": input_resume,
                                 "job_description": target_job
                             }
                         )
                         
                         if response.status_code == 200:
-                            result = response.json()
+                            result = _json(response)
                             
                             # Show before/after comparison
                             st.subheader("📋 Before vs After")
@@ -323,11 +462,20 @@ with tab4:
                             
                             with col_before:
                                 st.markdown("### 📄 Original")
-                                st.text_area("", value=result.get('original_resume', ''), height=150, disabled=True, key="preview_original")
+                                with st.container(height=150):
+                                    st.code(result.get('original_resume', ''), language=None)
                             
                             with col_after:
                                 st.markdown("### ✨ Optimized")
-                                st.text_area("", value=result.get('optimized_resume', ''), height=150, disabled=True, key="preview_optimized")
+                                with st.container(height=150):
+                                    st.code(result.get('optimized_resume', ''), language=None)
+                            
+                            # The preview already carries the match analysis, so show it
+                            # here instead of needing a separate /match round-trip
+                            match_result = result.get('optimization_data', {}).get('match_score', {})
+                            if match_result:
+                                st.metric("📊 Current Match Score", f"{match_result['overall_score']}%")
+                                st.write(f"**{match_result['recommendation']}**")
                             
                             # Show improvements
                             improvements = result.get('improvements', {})
@@ -337,18 +485,16 @@ with tab4:
                                 col_skills, col_keywords, col_score = st.columns(3)
                                 
                                 with col_skills:
-                                    skills_added = improvements.get('skills_added', [])
-                                    if skills_added:
+                                    skills_added_md = improvements.get('skills_added_md', '')
+                                    if skills_added_md:
                                         st.success("**Skills Added:**")
-                                        for skill in skills_added:
-                                            st.write(f"• {skill}")
+                                        st.markdown(skills_added_md)
                                 
                                 with col_keywords:
-                                    keywords_added = improvements.get('keywords_added', [])
-                                    if keywords_added:
+                                    keywords_added_md = improvements.get('keywords_added_md', '')
+                                    if keywords_added_md:
                                         st.info("**Keywords Added:**")
-                                        for keyword in keywords_added[:5]:
-                                            st.write(f"• {keyword}")
+                                        st.markdown(keywords_added_md)
                                 
                                 with col_score:
                                     improvement_estimate = improvements.get('match_score_improvement', '')
@@ -366,17 +512,24 @@ with tab4:
             if input_resume and target_job:
                 with st.spinner(f"Generating {format_choice.upper()} resume..."):
                     try:
-                        response = requests.post(
-                            f"{API_BASE}/generate",
-                            json={
+                        response = post_json(
+                            "/generate",
+                            {
                                 "resume": input_resume,
                                 "job_description": target_job,
                                 "applicant_name": applicant_name,
                                 "format": format_choice
-                            }
+                            },
+                            stream=True
                         )
                         
                         if response.status_code == 200:
+                            # Read the file body in chunks rather than through response.content
+                            buffer = io.BytesIO()
+                            for chunk in response.iter_content(64 * 1024):
+                                buffer.write(chunk)
+                            buffer.seek(0)
+                            
                             # Get filename from response headers
                             content_disposition = response.headers.get('content-disposition', '')
                             filename = f"{applicant_name.replace(' ', '_')}_optimized_resume.{format_choice}"
@@ -388,10 +541,14 @@ with tab4:
                             # Create download button
                             st.download_button(
                                 label=f"📥 Download {format_choice.upper()} Resume",
-                                data=response.content,
+                                # Handed over as-is; no second copy of the file
+                                data=buffer,
                                 file_name=filename,
                                 mime=response.headers.get('content-type', 'application/octet-stream'),
-                                use_container_width=True
+                                use_container_width=True,
+                                # The file is served from Streamlit's media endpoint; clicking
+                                # shouldn't rerun the app (and regenerate the resume)
+                                on_click="ignore"
                             )
                             
                             st.info("💡 **Your optimized resume includes:**")
@@ -399,6 +556,9 @@ with tab4:
                             st.write("• Job-specific keywords incorporated")
                             st.write("• ATS-friendly formatting")
                             st.write("• Professional layout and structure")
+                        else:
+                            # Unread streamed responses hold their pooled connection
+                            response.close()
                             
                     except Exception as e:
                         st.error(f"Generation failed: {str(e)}")
@@ -410,16 +570,9 @@ with tab4:
             if input_resume and target_job:
                 with st.spinner("Calculating match..."):
                     try:
-                        response = requests.post(
-                            f"{API_BASE}/match",
-                            json={
-                                "resume": input_resume,
-                                "job_description": target_job
-                            }
-                        )
+                        match_result = fetch_match(input_resume, target_job)['match_analysis']
                         
-                        if response.status_code == 200:
-                            match_result = response.json()['match_analysis']
+                        if match_result:
                             
                             # Quick score display
                             overall = match_result['overall_score']
@@ -437,15 +590,14 @@ with tab4:
             else:
                 st.warning("Please enter both resume and job description.")
 
+with tab4:
+    generator_tab()
+
 # Footer
 st.markdown("---")
 st.markdown("**ResumeBeaver** - Built for IBM TechXchange 2025 Hackathon 🦫")
 st.markdown("🤖 Powered by IBM Watson AI • 🎯 Resume Generation • 📊 ATS Optimization")
 
-# Initialize session state
-if 'resume_text' not in st.session_state:
-    st.session_state['resume_text'] = ""
-if 'job_description' not in st.session_state:
-    st.session_state['job_description'] = ""
-if 'uploaded_resume_text' not in st.session_state:
-    st.session_state['uploaded_resume_text'] = ""
\ No newline at end of file
+# Initialize session state (no-op once the keys exist)
+for key in ('resume_text', 'job_description', 'uploaded_resume_text'):
+    st.session_state.setdefault(key, "")
\ No newline at end of file
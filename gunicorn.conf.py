@@ -0,0 +1,14 @@
+# Production server config: gunicorn -c gunicorn.conf.py
+import multiprocessing
+import os
+
+wsgi_app = "main:app"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Analysis is CPU-bound, so scale workers with cores instead of one event loop
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app once in the master so the analyzer, compiled patterns and
+# Watson client are shared copy-on-write across forked workers
+preload_app = True
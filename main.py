@@ -7,9 +7,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from middleware import GZipRequestMiddleware
 from routes import router
 
 import logging
+import os
 
 # Set up logging
 logging.basicConfig(level=getattr(logging, __import__("os").getenv("LOG_LEVEL", "INFO")))
@@ -31,12 +34,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip in both directions: inflate compressed request bodies (the frontend
+# compresses uploads and large JSON) and compress responses of 1KB or more
+app.add_middleware(GZipRequestMiddleware)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include unified routes
 app.include_router(router)
 
 # Root endpoint
 @app.get("/")
-async def root():
+async def root() -> dict:
     return {
         "name": "Resume Optimizer API",
         "version": "2.0.0",
@@ -62,4 +70,13 @@ async def startup_event():
         logger.error(f"❌ Watson client error: {e}")
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # One process per core by default; UVICORN_RELOAD=1 gives a single auto-reloading
+    # process for development. uvicorn[standard] picks uvloop and httptools automatically.
+    reload = os.getenv("UVICORN_RELOAD", "").lower() in ("1", "true", "yes")
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=reload,
+        workers=None if reload else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    )
\ No newline at end of file
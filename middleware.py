@@ -0,0 +1,71 @@
+import zlib
+
+from starlette.responses import JSONResponse
+
+# Decompressed request bodies larger than this are rejected. Uploads are capped
+# at 10MB; the extra room covers multipart framing.
+MAX_DECOMPRESSED_BODY = 11 * 1024 * 1024
+
+class GZipRequestMiddleware:
+    """Decompress request bodies sent with Content-Encoding: gzip
+
+    Starlette only compresses responses; clients that gzip their uploads need
+    the body inflated before FastAPI parses the form or JSON.
+    """
+
+    def __init__(self, app, max_body_size: int = MAX_DECOMPRESSED_BODY):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _is_gzip(scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        # wbits=16+MAX_WBITS expects a gzip header and trailer
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = bytearray()
+        more_body = True
+        try:
+            while more_body:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return
+                # Cap the output per chunk so a gzip bomb never fully inflates
+                body += decompressor.decompress(message.get("body", b""), self.max_body_size + 1 - len(body))
+                if len(body) > self.max_body_size or decompressor.unconsumed_tail:
+                    await JSONResponse({"detail": "Request body too large"}, status_code=413)(scope, receive, send)
+                    return
+                more_body = message.get("more_body", False)
+            body += decompressor.flush()
+        except zlib.error:
+            await JSONResponse({"detail": "Invalid gzip request body"}, status_code=400)(scope, receive, send)
+            return
+        if not decompressor.eof:
+            await JSONResponse({"detail": "Truncated gzip request body"}, status_code=400)(scope, receive, send)
+            return
+
+        # Downstream sees a plain body with a matching Content-Length
+        headers = [
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        scope = dict(scope, headers=headers)
+
+        body_sent = False
+
+        async def receive_decompressed():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": bytes(body), "more_body": False}
+
+        await self.app(scope, receive_decompressed, send)
+
+def _is_gzip(headers) -> bool:
+    for name, value in headers:
+        if name == b"content-encoding":
+            return value.strip().lower() == b"gzip"
+    return False
@@ -1,11 +1,162 @@
 # Minimal resume analysis that works without problematic ML libraries
 
-from typing import Dict, List, Optional, Set
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
 import re
 import logging
 
+# Prefer RE2 (linear-time DFA, no backtracking) for the big skill alternation.
+# Optional; its \b and case folding are ASCII-only, so a few non-ASCII edge
+# cases match differently than under re.
+try:
+    import re2 as fast_re
+except ImportError:
+    fast_re = re
+
+# Skill vocabulary by category (plain names, escaped when the pattern is built)
+SKILL_PATTERNS = {
+    'languages': [
+        'Python', 'JavaScript', 'TypeScript', 'Java', 'C++', 'C#', 
+        'Ruby', 'Go', 'Rust', 'Swift', 'Kotlin', 'PHP', 'R', 'Scala',
+        'HTML', 'CSS', 'SQL', 'NoSQL', 'GraphQL', 'C', 'Perl', 'Shell'
+    ],
+    'frameworks': [
+        'React', 'Angular', 'Vue', 'Django', 'Flask', 'FastAPI', 'Spring',
+        'Express', 'Node.js', 'Rails', 'Laravel', '.NET', 'Next.js',
+        'Bootstrap', 'Tailwind', 'jQuery', 'Svelte', 'Nuxt', 'Gatsby'
+    ],
+    'databases': [
+        'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'SQLite', 'Oracle',
+        'DynamoDB', 'Cassandra', 'ElasticSearch', 'Neo4j', 'Firebase',
+        'MariaDB', 'CouchDB', 'InfluxDB'
+    ],
+    'cloud': [
+        'AWS', 'Azure', 'GCP', 'Google Cloud', 'Docker', 'Kubernetes',
+        'Terraform', 'CloudFormation', 'Heroku', 'DigitalOcean',
+        'Vercel', 'Netlify', 'Firebase'
+    ],
+    'tools': [
+        'Git', 'GitHub', 'GitLab', 'Jenkins', 'CI/CD', 'JIRA', 'Slack',
+        'VS Code', 'IntelliJ', 'Postman', 'Swagger', 'GraphQL', 'REST',
+        'Figma', 'Adobe', 'Photoshop', 'Sketch'
+    ]
+}
+
+# Lowercased skill -> [(category, display name)]; some skills sit in two categories
+_SKILL_LOOKUP: Dict[str, List[Tuple[str, str]]] = {}
+for _category, _skills in SKILL_PATTERNS.items():
+    for _skill in _skills:
+        _SKILL_LOOKUP.setdefault(_skill.lower(), []).append((_category, _skill))
+
+# Word boundaries only make sense next to word characters ('C++', 'C#', '.NET')
+def _skill_alternative(skill: str) -> str:
+    pattern = re.escape(skill)
+    if skill[0].isalnum():
+        pattern = r'\b' + pattern
+    if skill[-1].isalnum():
+        pattern += r'\b'
+    return pattern
+
+# One alternation over every skill, longest first so 'C++' wins over 'C'.
+# Inline (?i) instead of re.IGNORECASE so the same pattern compiles under RE2.
+_SKILL_RE = fast_re.compile(
+    '(?i)' + '|'.join(_skill_alternative(s) for s in sorted(_SKILL_LOOKUP, key=len, reverse=True))
+)
+
+# Stable bit position per skill so skill sets can be compared as int bitmasks
+_SKILL_ID = {skill: i for i, skill in enumerate(_SKILL_LOOKUP)}
+_SKILL_NAMES = [entries[0][1] for entries in _SKILL_LOOKUP.values()]
+
+# Non-ASCII letters that case-insensitive matching treats as ASCII ones
+# ("Gıt" matches Git) but that str.lower() leaves alone
+_ASCII_CASE_FOLD = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'})
+
+# Bitmask of every skill mentioned in text
+def _skill_mask(text: str) -> int:
+    mask = 0
+    for match in _SKILL_RE.findall(text):
+        skill_id = _SKILL_ID.get(match.lower())
+        if skill_id is None:
+            skill_id = _SKILL_ID.get(match.translate(_ASCII_CASE_FOLD).lower())
+            if skill_id is None:
+                continue
+        mask |= 1 << skill_id
+    return mask
+
+# Display names for the skills set in mask, in vocabulary order
+def _skill_names(mask: int) -> List[str]:
+    names = []
+    while mask:
+        lowest = mask & -mask
+        names.append(_SKILL_NAMES[lowest.bit_length() - 1])
+        mask ^= lowest
+    return names
+
+# Skills in mask grouped by category, plus 'all', in vocabulary order
+def _skill_categories(mask: int) -> Dict[str, List[str]]:
+    results = {category: [] for category in SKILL_PATTERNS}
+    results['all'] = _skill_names(mask)
+    for name in results['all']:
+        for category, skill in _SKILL_LOOKUP[name.lower()]:
+            results[category].append(skill)
+    return results
+
+# Contact patterns, compiled once; also used by the ATS contact check
+_EMAIL_RE = re.compile(r'\b[\w.%+-]+@[\w.-]+\.[A-Za-z]{2,}\b')
+# US phone: optional +1, area code, then exchange and line number. Runs of
+# whitespace after the area code are allowed only before a "-"/"." separator
+# ("(555)   123-4567").
+_PHONE_RE = re.compile(
+    r'(?:\+?1[-.\s]?)?\(?(\d{3})\)?'
+    r'(?:[-.\s]?(\d{3})[-.\s]?|\s*(\d{3})[-.])'
+    r'(\d{4})'
+)
+_LINKEDIN_RE = re.compile(r'linkedin\.com/in/([\w-]+)', re.IGNORECASE)
+_GITHUB_RE = re.compile(r'github\.com/([\w-]+)', re.IGNORECASE)
+
+# "5 years", "10+ years"
+_EXPERIENCE_YEARS_RE = re.compile(r'(\d+)\+?\s*years?', re.IGNORECASE)
+
+# Common stop words, ignored by keyword extraction
+STOP_WORDS = frozenset({
+    'a', 'all', 'am', 'an', 'and', 'any', 'are', 'as', 'at', 'be',
+    'been', 'but', 'by', 'can', 'co', 'company', 'corp', 'could', 'do',
+    'each', 'for', 'from', 'had', 'has', 'have', 'he', 'her', 'how',
+    'in', 'inc', 'is', 'it', 'its', 'llc', 'ltd', 'may', 'might',
+    'must', 'of', 'on', 'or', 'pm', 'said', 'shall', 'she', 'should',
+    'that', 'the', 'their', 'there', 'they', 'this', 'to', 'was', 'we',
+    'what', 'which', 'will', 'with', 'would', 'you'
+})
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# Section headers an ATS expects to find
+ATS_SECTIONS = ('experience', 'education', 'skills', 'summary', 'work', 'employment')
+_ATS_SECTION_RE = re.compile(r'\b(' + '|'.join(ATS_SECTIONS) + r')\b', re.IGNORECASE)
+
+# Bullets and symbols that commonly confuse ATS parsers
+ATS_SPECIAL_CHARS = '•→★◆▪✓✗←↑↓'
+_ATS_SPECIAL_CHARS_RE = re.compile(f'[{re.escape(ATS_SPECIAL_CHARS)}]')
+
+# Recommendation for each issue _calculate_ats_score can report
+ATS_RECOMMENDATIONS = {
+    "Missing standard section headers": "Add clear section headers: Experience, Education, Skills",
+    "No email address found": "Include your email address at the top",
+    "No phone number found": "Add a phone number in standard format",
+    "Contains special characters that may confuse ATS": "Replace bullet points with standard dashes (-) or asterisks (*)",
+    "Document appears to lack proper line breaks": "Use proper paragraph formatting with clear sections"
+}
+
+# Match-scoring features of a single document (a pure function of its text)
+class DocumentFeatures(NamedTuple):
+    skill_mask: int
+    keywords: FrozenSet[str]
+    words: FrozenSet[str]
+
 class ResumeAnalyzer:    
     def __init__(self, use_watson: bool = True):
+        # Memoized per text: users typically score one resume against several jobs
+        self._document_features = lru_cache(maxsize=512)(self._compute_document_features)
         self.use_watson = use_watson
         self.watson_client = None
         if use_watson:
@@ -17,124 +168,76 @@ class ResumeAnalyzer:
     
     # Extract all skills from text with categorization
     def extract_skills(self, text: str) -> Dict[str, List[str]]:
-        skill_patterns = {
-            'languages': [
-                'Python', 'JavaScript', 'TypeScript', 'Java', 'C\\+\\+', 'C#', 
-                'Ruby', 'Go', 'Rust', 'Swift', 'Kotlin', 'PHP', 'R', 'Scala',
-                'HTML', 'CSS', 'SQL', 'NoSQL', 'GraphQL', 'C', 'Perl', 'Shell'
-            ],
-            'frameworks': [
-                'React', 'Angular', 'Vue', 'Django', 'Flask', 'FastAPI', 'Spring',
-                'Express', 'Node\\.js', 'Rails', 'Laravel', '.NET', 'Next\\.js',
-                'Bootstrap', 'Tailwind', 'jQuery', 'Svelte', 'Nuxt', 'Gatsby'
-            ],
-            'databases': [
-                'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'SQLite', 'Oracle',
-                'DynamoDB', 'Cassandra', 'ElasticSearch', 'Neo4j', 'Firebase',
-                'MariaDB', 'CouchDB', 'InfluxDB'
-            ],
-            'cloud': [
-                'AWS', 'Azure', 'GCP', 'Google Cloud', 'Docker', 'Kubernetes',
-                'Terraform', 'CloudFormation', 'Heroku', 'DigitalOcean',
-                'Vercel', 'Netlify', 'Firebase'
-            ],
-            'tools': [
-                'Git', 'GitHub', 'GitLab', 'Jenkins', 'CI/CD', 'JIRA', 'Slack',
-                'VS Code', 'IntelliJ', 'Postman', 'Swagger', 'GraphQL', 'REST',
-                'Figma', 'Adobe', 'Photoshop', 'Sketch'
-            ]
-        }
-        
-        results = {category: [] for category in skill_patterns}
-        results['all'] = []
-        text_lower = text.lower()
-        
-        for category, skills in skill_patterns.items():
-            for skill in skills:
-                pattern = r'\b' + skill.lower().replace('\\', '\\') + r'\b'
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    clean_skill = skill.replace('\\', '')
-                    results[category].append(clean_skill)
-                    results['all'].append(clean_skill)
-        
-        # Remove duplicates
-        for category in results:
-            results[category] = list(set(results[category]))
-        
-        return results
+        # Single scan over the text; the bitmask deduplicates hits
+        return _skill_categories(_skill_mask(text))
     
     # Extract contact information from resume
     def extract_contact(self, text: str) -> Dict[str, Optional[str]]:
         contact = {}
         
         # Email
-        email_match = re.search(r'\b[\w._%+-]+@[\w.-]+\.[A-Z|a-z]{2,}\b', text)
+        email_match = _EMAIL_RE.search(text)
         contact['email'] = email_match.group(0) if email_match else None
         
         # Phone (US format)
-        phone_patterns = [
-            r'(\+?1[-.\s]?)?\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})',
-            r'(\d{3})[-.](\d{3})[-.](\d{4})',
-            r'\(?(\d{3})\)?\s*(\d{3})[-.](\d{4})'
-        ]
-        
-        for pattern in phone_patterns:
-            phone_match = re.search(pattern, text)
-            if phone_match:
-                digits = ''.join(filter(str.isdigit, phone_match.group(0)))
-                if len(digits) >= 10:
-                    contact['phone'] = f"({digits[-10:-7]}) {digits[-7:-4]}-{digits[-4:]}"
-                    break
-        
-        if 'phone' not in contact:
+        phone_match = _PHONE_RE.search(text)
+        if phone_match:
+            area, exchange, spaced_exchange, line = phone_match.groups()
+            contact['phone'] = f"({area}) {exchange or spaced_exchange}-{line}"
+        else:
             contact['phone'] = None
         
         # LinkedIn
-        linkedin_match = re.search(r'linkedin\.com/in/([\w-]+)', text, re.IGNORECASE)
+        linkedin_match = _LINKEDIN_RE.search(text)
         contact['linkedin'] = f"https://linkedin.com/in/{linkedin_match.group(1)}" if linkedin_match else None
         
         # GitHub
-        github_match = re.search(r'github\.com/([\w-]+)', text, re.IGNORECASE)
+        github_match = _GITHUB_RE.search(text)
         contact['github'] = f"https://github.com/{github_match.group(1)}" if github_match else None
         
         return contact
     
+    # Largest "N years" / "N+ years" figure mentioned in text
+    def extract_experience_years(self, text: str) -> Optional[int]:
+        exp_matches = _EXPERIENCE_YEARS_RE.findall(text)
+        return max(map(int, exp_matches)) if exp_matches else None
+    
     # Basic keyword extraction (no external dependencies)
-    def _extract_keywords_basic(self, text: str) -> Set[str]:
-        """Basic keyword extraction"""
-        # Common stop words
-        stop_words = {
-            'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from',
-            'has', 'he', 'in', 'is', 'it', 'its', 'of', 'on', 'that', 'the',
-            'to', 'was', 'will', 'with', 'have', 'had', 'this', 'they', 'been',
-            'their', 'said', 'each', 'which', 'she', 'do', 'how', 'her', 'has',
-            'or', 'but', 'what', 'there', 'we', 'you', 'all', 'any', 'can', 'had',
-            'would', 'could', 'should', 'may', 'might', 'must', 'shall', 'will',
-            'am', 'pm', 'inc', 'llc', 'corp', 'ltd', 'co', 'company'
-        }
-        
-        # Extract words, filter out stop words and short words
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        keywords = {word for word in words if word not in stop_words and len(word) > 2}
-        
-        return keywords
+    def _extract_keywords_basic(self, text_lower: str) -> Set[str]:
+        """Basic keyword extraction from already-lowercased text"""
+        # Words of 3+ letters that aren't stop words
+        return {word for word in _WORD_RE.findall(text_lower) if word not in STOP_WORDS}
+    
+    # Skills, keywords and raw words of one document (use the cached _document_features).
+    # The text is lowercased once and every scan runs over that copy.
+    def _compute_document_features(self, text: str) -> DocumentFeatures:
+        text_lower = text.lower()
+        return DocumentFeatures(
+            skill_mask=_skill_mask(text_lower),
+            keywords=frozenset(self._extract_keywords_basic(text_lower)),
+            words=frozenset(text_lower.split())
+        )
     
     # Calculate basic match score without ML libraries
     def calculate_match_score(self, resume: str, job_desc: str) -> Dict:
-        # Skill matching
-        resume_skills = set(self.extract_skills(resume)['all'])
-        job_skills = set(self.extract_skills(job_desc)['all'])
+        resume_features = self._document_features(resume)
+        job_features = self._document_features(job_desc)
+        
+        # Skill matching on bitmasks; names are only materialized for the response
+        resume_skills = resume_features.skill_mask
+        job_skills = job_features.skill_mask
+        matching_skills = resume_skills & job_skills
         
         if job_skills:
-            skill_coverage = len(resume_skills & job_skills) / len(job_skills)
-            missing_skills = list(job_skills - resume_skills)
+            skill_coverage = bin(matching_skills).count('1') / bin(job_skills).count('1')
+            missing_skills = _skill_names(job_skills & ~resume_skills)
         else:
             skill_coverage = 0.0
             missing_skills = []
         
         # Basic keyword matching
-        resume_keywords = self._extract_keywords_basic(resume)
-        job_keywords = self._extract_keywords_basic(job_desc)
+        resume_keywords = resume_features.keywords
+        job_keywords = job_features.keywords
         
         if job_keywords:
             keyword_coverage = len(resume_keywords & job_keywords) / len(job_keywords)
@@ -142,8 +245,8 @@ class ResumeAnalyzer:
             keyword_coverage = 0.0
         
         # Simple text similarity (word overlap)
-        resume_words = set(resume.lower().split())
-        job_words = set(job_desc.lower().split())
+        resume_words = resume_features.words
+        job_words = job_features.words
         
         if job_words:
             word_overlap = len(resume_words & job_words) / len(job_words)
@@ -163,7 +266,7 @@ class ResumeAnalyzer:
             'skill_match': round(skill_coverage * 100, 1),
             'keyword_match': round(keyword_coverage * 100, 1),
             'missing_skills': missing_skills[:10],
-            'matching_skills': list(resume_skills & job_skills),
+            'matching_skills': _skill_names(matching_skills),
             'recommendation': self._get_recommendation(overall_score)
         }
     
@@ -180,19 +283,17 @@ class ResumeAnalyzer:
     
     # Analyze resume without external ML dependencies
     def analyze_resume(self, resume_text: str) -> Dict:
-        skills = self.extract_skills(resume_text)
+        # Skills come from the cached document features, so the lowercased scan is
+        # shared with a following match/optimize call on the same resume
+        skills = _skill_categories(self._document_features(resume_text).skill_mask)
         contact = self.extract_contact(resume_text)
         
-        # Extract experience years
-        exp_matches = re.findall(r'(\d+)\+?\s*years?', resume_text, re.IGNORECASE)
-        years_experience = max(map(int, exp_matches)) if exp_matches else None
-        
         result = {
             'contact_info': contact,
             'skills': skills,
-            'years_experience': years_experience,
+            'years_experience': self.extract_experience_years(resume_text),
             'word_count': len(resume_text.split()),
-            'ats_score': self._calculate_ats_score(resume_text),
+            'ats_score': self._calculate_ats_score(resume_text, contact),
             'processing_mode': 'basic'  # Indicate we're using basic processing
         }
         
@@ -207,19 +308,19 @@ class ResumeAnalyzer:
         return result
     
     # Calculate ATS compatibility score
-    def _calculate_ats_score(self, text: str) -> Dict:
+    def _calculate_ats_score(self, text: str, contact: Optional[Dict[str, Optional[str]]] = None) -> Dict:
         score = 100
         issues = []
         
-        # Check for standard sections
-        sections = ['experience', 'education', 'skills', 'summary', 'work', 'employment']
-        found_sections = sum(1 for s in sections if s in text.lower())
+        # Check for standard sections (one scan; whole words, so "network" isn't "work")
+        found_sections = len({m.group(1).lower() for m in _ATS_SECTION_RE.finditer(text)})
         if found_sections < 2:
             score -= 20
             issues.append("Missing standard section headers")
         
-        # Check for contact info
-        contact = self.extract_contact(text)
+        # Check for contact info (reuse the caller's extraction when it has one)
+        if contact is None:
+            contact = self.extract_contact(text)
         if not contact.get('email'):
             score -= 15
             issues.append("No email address found")
@@ -227,14 +328,13 @@ class ResumeAnalyzer:
             score -= 10
             issues.append("No phone number found")
         
-        # Check for problematic characters
-        problematic_chars = ['•', '→', '★', '◆', '▪', '✓', '✗', '→', '←', '↑', '↓']
-        if any(char in text for char in problematic_chars):
+        # Check for problematic characters (one scan that stops at the first hit, no copy)
+        if _ATS_SPECIAL_CHARS_RE.search(text):
             score -= 10
             issues.append("Contains special characters that may confuse ATS")
         
-        # Check for proper formatting
-        if len(text.split('\n')) < 5:
+        # Check for proper formatting (fewer than 5 lines means fewer than 4 line breaks)
+        if text.count('\n') < 4:
             score -= 15
             issues.append("Document appears to lack proper line breaks")
         
@@ -246,36 +346,25 @@ class ResumeAnalyzer:
     
     # Generate ATS improvement recommendations
     def _get_ats_recommendations(self, issues: List[str]) -> List[str]:
-        recommendations = []
-        
-        if "Missing standard section headers" in issues:
-            recommendations.append("Add clear section headers: Experience, Education, Skills")
-        if "No email address found" in issues:
-            recommendations.append("Include your email address at the top")
-        if "No phone number found" in issues:
-            recommendations.append("Add a phone number in standard format")
-        if any("special characters" in issue for issue in issues):
-            recommendations.append("Replace bullet points with standard dashes (-) or asterisks (*)")
-        if any("line breaks" in issue for issue in issues):
-            recommendations.append("Use proper paragraph formatting with clear sections")
-        
-        return recommendations
+        # Issues are reported in check order, so recommendations keep that order too
+        return [ATS_RECOMMENDATIONS[issue] for issue in issues if issue in ATS_RECOMMENDATIONS]
     
     # Optimize resume for specific job (simplified version)
-    def optimize_resume(self, resume: str, job_desc: str) -> Dict:
+    def optimize_resume(self, resume: str, job_desc: str, ats_analysis: Optional[Dict] = None) -> Dict:
         match_analysis = self.calculate_match_score(resume, job_desc)
         
         # Extract keywords that appear in job but not in resume
-        job_keywords = self._extract_keywords_basic(job_desc)
-        resume_keywords = self._extract_keywords_basic(resume)
-        missing_keywords = list(job_keywords - resume_keywords)[:15]
+        job_keywords = self._document_features(job_desc).keywords
+        resume_keywords = self._document_features(resume).keywords
+        # Stop after 15 instead of building the whole difference set
+        missing_keywords = list(islice((k for k in job_keywords if k not in resume_keywords), 15))
         
         optimization = {
             'match_score': match_analysis,
             'missing_keywords': missing_keywords,
             'missing_skills': match_analysis['missing_skills'],
             'suggestions': self._generate_suggestions(match_analysis),
-            'ats_analysis': self._calculate_ats_score(resume),
+            'ats_analysis': ats_analysis or self._calculate_ats_score(resume),
             'processing_mode': 'basic'
         }
         
@@ -298,6 +387,15 @@ class ResumeAnalyzer:
         
         return optimization
     
+    # Resume analysis plus job optimization in one pass (a single Watson call)
+    def analyze_and_optimize(self, resume: str, job_desc: str) -> Dict:
+        analysis = self.analyze_resume(resume)
+        optimization = self.optimize_resume(resume, job_desc, ats_analysis=analysis['ats_score'])
+        return {
+            'analysis': analysis,
+            'optimization': optimization
+        }
+    
     # Generate improvement suggestions
     def _generate_suggestions(self, match_analysis: Dict) -> List[Dict]:
         suggestions = []
@@ -1,23 +1,139 @@
 import re
-from fastapi import APIRouter, UploadFile, File, HTTPException, Response
+from fastapi import APIRouter, BackgroundTasks, Header, UploadFile, File, HTTPException, Response
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import orjson
 import os
 import shutil
+import subprocess
+import threading
+import time
 from datetime import datetime
-import PyPDF2
-from docx import Document
-from docx.shared import Inches
-from docx.enum.text import WD_ALIGN_PARAGRAPH
 from resume_processor import ResumeAnalyzer
 import tempfile
 import uuid
 
+# python-docx and PyPDF2 are imported inside the functions that use them, so
+# starting the API (and each extraction worker process) doesn't pay for them
+
+# PyMuPDF extracts text in C and is much faster than PyPDF2; optional. Newer
+# releases name the module pymupdf; "fitz" is the legacy alias.
+try:
+    import pymupdf as fitz
+except ImportError:
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+
+# Poppler's pdftotext is the fastest extractor; used whenever it is installed
+PDFTOTEXT = shutil.which("pdftotext")
+
+# Plain text only: never decode images, and expand ligatures so "ﬁ" matches "fi"
+PDF_TEXT_FLAGS = (
+    (fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_IMAGES & ~fitz.TEXT_PRESERVE_LIGATURES)
+    if fitz is not None else 0
+)
+
 router = APIRouter()
 
+# Document parsing is CPU-bound, so it runs in worker processes (off the event
+# loop and outside the GIL). Created on first use so nothing forks at import.
+# Every web worker gets its own pool, so keep the default small: the process
+# count is web workers × EXTRACT_WORKERS.
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", 2))
+_extract_pool: Optional[ProcessPoolExecutor] = None
+
+# PDFs with at least this many pages are split across the pool by page range
+PDF_PARALLEL_MIN_PAGES = 4
+
+# Uploaded files are kept here; created once at import, not per request
+UPLOAD_DIR = "uploads"
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Upload limits; size is enforced on the bytes actually read
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 64 * 1024
+ALLOWED_EXTENSIONS = frozenset({'.pdf', '.docx', '.doc', '.txt'})
+
+# Extracted text of recent uploads keyed by (sha256 of bytes, file type); users
+# re-upload the same resume while iterating on job descriptions
+TEXT_CACHE_SIZE = 128
+_text_cache: "OrderedDict[Tuple[bytes, str], str]" = OrderedDict()
+
+# optimize_resume results keyed by blake2b of (resume, job description), with
+# the time they were computed; /preview followed by /generate on the same inputs
+# is the normal flow. The endpoints run in the threadpool, hence the lock.
+OPTIMIZE_CACHE_SIZE = 512
+OPTIMIZE_CACHE_TTL = 3600  # seconds
+_optimize_cache: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+_optimize_cache_lock = threading.Lock()
+
+# /status payload with its ETag and build time; the frontend polls it
+STATUS_CACHE_TTL = 30  # seconds
+_status_cache: Optional[Tuple[float, dict, str]] = None
+
+def get_extract_pool() -> ProcessPoolExecutor:
+    global _extract_pool
+    if _extract_pool is None:
+        # Never fork the server itself: by now threadpool threads exist, and a
+        # child forked while one of them held a lock (logging's, say) deadlocks
+        _extract_pool = ProcessPoolExecutor(
+            max_workers=EXTRACT_WORKERS, mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _extract_pool
+
+async def run_in_extract_pool(fn, *args):
+    """Run fn in the extraction pool, replacing the pool if a worker died"""
+    global _extract_pool
+    pool = get_extract_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        # A crashed child (say, MuPDF on a hostile PDF) breaks the whole pool;
+        # drop it so later uploads get a fresh one instead of failing forever
+        if _extract_pool is pool:
+            _extract_pool = None
+            pool.shutdown(wait=False)
+        raise
+
 # Initialize analyzer (Watson will auto-detect availability)
 analyzer = ResumeAnalyzer(use_watson=True)
 
+def cached_optimize_resume(resume: str, job_description: str) -> dict:
+    """analyzer.optimize_resume, reusing the result for identical inputs"""
+    key = hashlib.blake2b(f"{resume}\0{job_description}".encode("utf-8"), digest_size=16).digest()
+    now = time.monotonic()
+    with _optimize_cache_lock:
+        entry = _optimize_cache.get(key)
+        if entry is not None and now - entry[0] < OPTIMIZE_CACHE_TTL:
+            _optimize_cache.move_to_end(key)
+            return entry[1]
+    
+    result = analyzer.optimize_resume(resume, job_description)
+    # Don't pin a fallback result from a transient Watson failure for the TTL.
+    # The Watson client reports its local fallback as a success, so failures
+    # show up as ai_model == 'fallback_mode' rather than ai_powered == False.
+    watson = analyzer.watson_client
+    watson_answered = result.get('ai_powered') and result.get('ai_model') != 'fallback_mode'
+    if watson_answered or watson is None or not watson.watson_available:
+        with _optimize_cache_lock:
+            _optimize_cache[key] = (now, result)
+            _optimize_cache.move_to_end(key)
+            if len(_optimize_cache) > OPTIMIZE_CACHE_SIZE:
+                _optimize_cache.popitem(last=False)
+    return result
+
 # Request/Response models
 class AnalyzeRequest(BaseModel):
     content: str
@@ -37,33 +153,193 @@ class GenerateResumeRequest(BaseModel):
     applicant_name: str = "Applicant"
     format: str = "docx"  # "docx" or "txt"
 
-# Extract text from uploaded file
-def extract_file_text(file_path: str, file_type: str) -> str:
+def payload_etag(payload) -> str:
+    """Strong ETag for a JSON-serializable payload"""
+    digest = hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+def markdown_list(items) -> str:
+    """Render items as a markdown bullet list (one UI element instead of one per item)"""
+    return "\n".join(f"- {item}" for item in items)
+
+def extract_pdf_text(data: bytes) -> str:
+    """Extract text from PDF bytes via pdftotext, PyMuPDF or PyPDF2 (first available)"""
+    if PDFTOTEXT:
+        # Pipe the bytes through stdin/stdout; no temp files, no Python-level parsing
+        try:
+            result = subprocess.run([PDFTOTEXT, "-enc", "UTF-8", "-", "-"], input=data, capture_output=True, timeout=30)
+        except (subprocess.TimeoutExpired, OSError) as e:
+            logging.warning(f"pdftotext failed ({e}), falling back")
+        else:
+            if result.returncode == 0:
+                # Pages are separated by form feeds
+                return result.stdout.decode("utf-8", errors="replace").replace("\f", "\n").strip()
+            logging.warning(f"pdftotext failed ({result.returncode}), falling back: {result.stderr[:200]!r}")
+    
+    if fitz is not None:
+        try:
+            with fitz.open(stream=data, filetype="pdf") as doc:
+                return "\n".join(page.get_text("text", flags=PDF_TEXT_FLAGS) for page in doc).strip()
+        except Exception as e:
+            # PyPDF2 is more lenient with some malformed files
+            logging.warning(f"PyMuPDF failed ({e}), falling back to PyPDF2")
+    
+    import PyPDF2  # last-resort fallback; imported only when actually needed
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages).strip()
+
+# WordprocessingML tags read by extract_docx_text (Clark notation, as docx.oxml.ns.qn builds them)
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P, _W_TBL, _W_TR, _W_TC = _W_NS + 'p', _W_NS + 'tbl', _W_NS + 'tr', _W_NS + 'tc'
+_W_R, _W_HYPERLINK, _W_BR = _W_NS + 'r', _W_NS + 'hyperlink', _W_NS + 'br'
+_W_T, _W_BR_TYPE = _W_NS + 't', _W_NS + 'type'
+# Run content other than w:t and w:br, mapped the way python-docx 1.x does
+_W_RUN_CHARS = {_W_NS + 'cr': '\n', _W_NS + 'tab': '\t', _W_NS + 'ptab': '\t', _W_NS + 'noBreakHyphen': '-'}
+
+def _docx_run_text(el) -> str:
+    if el.tag == _W_T:
+        return el.text or ''
+    if el.tag == _W_BR:
+        # Line breaks only; page and column breaks carry no text
+        return '\n' if el.get(_W_BR_TYPE, 'textWrapping') == 'textWrapping' else ''
+    return _W_RUN_CHARS[el.tag]
+
+def _docx_paragraph_text(p) -> str:
+    """Same text as python-docx's Paragraph.text, without building the objects"""
+    # Only direct runs and hyperlinked runs: a full descendant walk would also
+    # pick up text boxes, which Word stores twice (mc:Choice and mc:Fallback)
+    parts = []
+    for child in p.iterchildren(_W_R, _W_HYPERLINK):
+        runs = (child,) if child.tag == _W_R else child.iterchildren(_W_R)
+        for r in runs:
+            parts.extend(_docx_run_text(el) for el in r.iterchildren(_W_T, _W_BR, *_W_RUN_CHARS))
+    return ''.join(parts)
+
+def extract_docx_text(data: bytes) -> str:
+    """Extract DOCX paragraphs, then table rows, in one walk over the body XML"""
+    from docx import Document
+    body = Document(io.BytesIO(data)).element.body
+    paragraphs = []
+    rows = []
+    
+    # Reads the lxml tree directly instead of building Paragraph/Table/Cell objects
+    for block in body.iterchildren(_W_P, _W_TBL):
+        if block.tag == _W_P:
+            text = _docx_paragraph_text(block)
+            if text:
+                paragraphs.append(text)
+            continue
+        for tr in block.iterchildren(_W_TR):
+            cells = (
+                "\n".join(_docx_paragraph_text(p) for p in tc.iterchildren(_W_P))
+                for tc in tr.iterchildren(_W_TC)
+            )
+            row_text = " | ".join(cell for cell in cells if cell)
+            if row_text:
+                rows.append(row_text)
+    
+    return "\n".join(paragraphs + rows).strip()
+
+def pdf_page_count(data: bytes) -> int:
+    """Page count of a PDF per PyMuPDF, 0 if it can't be opened"""
+    try:
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            return doc.page_count
+    except Exception:
+        return 0  # let extract_file_text report the parse error
+
+def extract_pdf_pages(data: bytes, start: int, stop: int) -> str:
+    """Extract text from pages [start, stop) of a PDF with PyMuPDF"""
+    # Each worker opens its own document; PyMuPDF objects can't be shared
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return "\n".join(doc[i].get_text("text", flags=PDF_TEXT_FLAGS) for i in range(start, stop))
+
+async def extract_upload_text(data: bytes, file_type: str) -> str:
+    """Extract text from an upload, reusing the result for identical bytes"""
+    key = (hashlib.sha256(data).digest(), file_type)
+    text = _text_cache.get(key)
+    if text is not None:
+        _text_cache.move_to_end(key)
+        return text
+    
+    text = await extract_in_pool(data, file_type)
+    _text_cache[key] = text
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return text
+
+async def extract_in_pool(data: bytes, file_type: str) -> str:
+    """Extract text in the process pool, fanning long PDFs out by page range"""
+    if file_type == 'txt':
+        # Decoding is cheaper than shipping the bytes to another process
+        return extract_file_text(data, file_type)
+    
+    page_count = 0
+    if file_type == 'pdf' and not PDFTOTEXT and fitz is not None and EXTRACT_WORKERS > 1:
+        # Opening the PDF is a parse too; keep it off the event loop
+        page_count = await run_in_extract_pool(pdf_page_count, data)
+    
+    if page_count >= PDF_PARALLEL_MIN_PAGES:
+        step = -(-page_count // EXTRACT_WORKERS)
+        try:
+            parts = await asyncio.gather(*(
+                run_in_extract_pool(extract_pdf_pages, data, start, min(start + step, page_count))
+                for start in range(0, page_count, step)
+            ))
+            return "\n".join(parts).strip()
+        except BrokenProcessPool:
+            raise  # a crashed worker would likely crash again on the same file
+        except Exception as e:
+            # extract_file_text falls back to PyPDF2 if PyMuPDF keeps failing
+            logging.warning(f"Page-range PDF extraction failed ({e}), extracting in one piece")
+    
+    return await run_in_extract_pool(extract_file_text, data, file_type)
+
+# Extract text from uploaded file contents (parsed in memory, no disk round-trip)
+def extract_file_text(data: bytes, file_type: str) -> str:
     try:
         if file_type == 'pdf':
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text.strip()
+            return extract_pdf_text(data)
         elif file_type in ['docx', 'doc']:
-            doc = Document(file_path)
-            text = "\n".join([para.text for para in doc.paragraphs if para.text])
-            
-            # Also extract from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = " | ".join([cell.text for cell in row.cells if cell.text])
-                    if row_text:
-                        text += "\n" + row_text
-            return text.strip()
+            return extract_docx_text(data)
         else:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return data.decode('utf-8')
     except Exception as e:
         raise Exception(f"Failed to extract text: {str(e)}")
 
+async def read_upload(file: UploadFile) -> bytes:
+    """Read an upload in chunks, aborting with 413 once it exceeds MAX_UPLOAD_SIZE"""
+    chunks = []
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > MAX_UPLOAD_SIZE:
+            raise HTTPException(413, "File too large (max 10MB)")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def save_upload(file_path: str, data: bytes):
+    """Keep a copy of an uploaded file (runs as a background task)"""
+    with open(file_path, 'wb') as f:
+        f.write(data)
+
+# Common section headers, in priority order: a line containing any keyword
+# starts that section, and the first section with a hit wins
+RESUME_SECTION_KEYWORDS = {
+    'SUMMARY': ['SUMMARY', 'OBJECTIVE', 'PROFILE', 'ABOUT'],
+    'EXPERIENCE': ['EXPERIENCE', 'WORK EXPERIENCE', 'EMPLOYMENT', 'WORK HISTORY'],
+    'EDUCATION': ['EDUCATION', 'ACADEMIC', 'LEARNING'],
+    'SKILLS': ['SKILLS', 'TECHNICAL SKILLS', 'COMPETENCIES', 'TECHNOLOGIES'],
+    'PROJECTS': ['PROJECTS', 'PROJECT EXPERIENCE'],
+    'CERTIFICATIONS': ['CERTIFICATIONS', 'CERTIFICATES', 'AWARDS']
+}
+# Flattened once to (keyword, section) pairs in the same order
+_SECTION_KEYWORD_PAIRS = tuple(
+    (keyword, section)
+    for section, keywords in RESUME_SECTION_KEYWORDS.items()
+    for keyword in keywords
+)
+
 def parse_resume_sections(resume_text: str) -> dict:
     """Parse resume text into structured sections"""
     sections = {}
@@ -72,36 +348,25 @@ def parse_resume_sections(resume_text: str) -> dict:
     
     lines = resume_text.split('\n')
     
-    # Common section headers
-    section_keywords = {
-        'SUMMARY': ['SUMMARY', 'OBJECTIVE', 'PROFILE', 'ABOUT'],
-        'EXPERIENCE': ['EXPERIENCE', 'WORK EXPERIENCE', 'EMPLOYMENT', 'WORK HISTORY'],
-        'EDUCATION': ['EDUCATION', 'ACADEMIC', 'LEARNING'],
-        'SKILLS': ['SKILLS', 'TECHNICAL SKILLS', 'COMPETENCIES', 'TECHNOLOGIES'],
-        'PROJECTS': ['PROJECTS', 'PROJECT EXPERIENCE'],
-        'CERTIFICATIONS': ['CERTIFICATIONS', 'CERTIFICATES', 'AWARDS']
-    }
-    
     for line in lines:
         line = line.strip()
         if not line:
             continue
         
-        # Check if this line is a section header
-        is_section_header = False
-        for section_name, keywords in section_keywords.items():
-            if any(keyword in line.upper() for keyword in keywords):
-                # Save previous section
-                if current_section and current_content:
-                    sections[current_section] = '\n'.join(current_content)
-                
-                # Start new section
-                current_section = section_name
-                current_content = []
-                is_section_header = True
-                break
-        
-        if not is_section_header and current_section:
+        # Check if this line is a section header (uppercased once per line)
+        line_upper = line.upper()
+        section_name = next(
+            (section for keyword, section in _SECTION_KEYWORD_PAIRS if keyword in line_upper), None
+        )
+        if section_name:
+            # Save previous section
+            if current_section and current_content:
+                sections[current_section] = '\n'.join(current_content)
+            
+            # Start new section
+            current_section = section_name
+            current_content = []
+        elif current_section:
             current_content.append(line)
     
     # Save the last section
@@ -139,30 +404,27 @@ def extract_contact_from_text(text: str) -> dict:
     """Extract contact information from resume text"""
     contact = {}
     
-    # Email
-    email_match = re.search(r'\b[\w._%+-]+@[\w.-]+\.[A-Z|a-z]{2,}\b', text)
-    if email_match:
-        contact['email'] = email_match.group(0)
-    
-    # Phone
-    phone_match = re.search(r'(\+?1[-.\s]?)?\(?(\d{3})\)?[-.\s]?(\d{3})[-.\s]?(\d{4})', text)
-    if phone_match:
-        digits = ''.join(filter(str.isdigit, phone_match.group(0)))
-        if len(digits) >= 10:
-            contact['phone'] = f"({digits[-10:-7]}) {digits[-7:-4]}-{digits[-4:]}"
-    
-    # LinkedIn
-    linkedin_match = re.search(r'linkedin\.com/in/([\w-]+)', text, re.IGNORECASE)
-    if linkedin_match:
-        contact['linkedin'] = f"linkedin.com/in/{linkedin_match.group(1)}"
-    
-    # GitHub
-    github_match = re.search(r'github\.com/([\w-]+)', text, re.IGNORECASE)
-    if github_match:
-        contact['github'] = f"github.com/{github_match.group(1)}"
+    # Reuse the analyzer's extraction; drop empty fields and the URL scheme for the header
+    for field, value in analyzer.extract_contact(text).items():
+        if value:
+            contact[field] = value.replace('https://', '', 1)
     
     return contact
 
+# Patterns used to rewrite resume text, compiled once
+_SKILLS_SECTION_RE = re.compile(
+    r'(\b(?:SKILLS|TECHNICAL SKILLS|COMPETENCIES)\b.*?)(\n\n|\n[A-Z][A-Z]|\Z)', re.IGNORECASE | re.DOTALL
+)
+_SUMMARY_SECTION_RE = re.compile(
+    r'(\b(?:SUMMARY|OBJECTIVE|PROFILE)\b.*?)(\n\n|\n[A-Z][A-Z]|\Z)', re.IGNORECASE | re.DOTALL
+)
+_EDUCATION_LINE_RE = re.compile(r'(\nEDUCATION)', re.IGNORECASE)
+_SECTION_HEADER_RE = re.compile(
+    r'\b(SUMMARY|OBJECTIVE|EXPERIENCE|EDUCATION|SKILLS|PROJECTS|CERTIFICATIONS)\b', re.IGNORECASE
+)
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_MULTIPLE_SPACES_RE = re.compile(r' {2,}')
+
 def apply_optimizations_to_text(original_resume: str, optimization_result: dict) -> str:
     """Apply optimization suggestions to create improved resume text"""
     
@@ -180,30 +442,27 @@ def apply_optimizations_to_text(original_resume: str, optimization_result: dict)
     if missing_skills:
         skills_to_add = missing_skills[:5]  # Add top 5 missing skills
         
-        # Find or create skills section
-        if re.search(r'\b(skills|technical skills|competencies)\b', optimized_text, re.IGNORECASE):
+        # Find or create skills section (the section pattern matches whenever a header exists)
+        skills_match = _SKILLS_SECTION_RE.search(optimized_text)
+        if skills_match:
             # Add to existing skills section
-            skills_pattern = r'(\b(?:SKILLS|TECHNICAL SKILLS|COMPETENCIES)\b.*?)(\n\n|\n[A-Z][A-Z]|\Z)'
-            skills_match = re.search(skills_pattern, optimized_text, re.IGNORECASE | re.DOTALL)
-            if skills_match:
-                skills_section = skills_match.group(1)
-                # Add skills in a clean format
-                enhanced_skills = skills_section.rstrip() + f"\n• {' • '.join(skills_to_add)}"
-                optimized_text = optimized_text.replace(skills_section, enhanced_skills)
+            skills_section = skills_match.group(1)
+            # Add skills in a clean format
+            enhanced_skills = skills_section.rstrip() + f"\n• {' • '.join(skills_to_add)}"
+            optimized_text = optimized_text.replace(skills_section, enhanced_skills)
         else:
             # Add new skills section before education/experience
             skills_section = f"\n\nSKILLS\n• {' • '.join(skills_to_add)}"
             # Insert before EDUCATION section if it exists
             if 'EDUCATION' in optimized_text.upper():
-                optimized_text = re.sub(r'(\nEDUCATION)', skills_section + r'\1', optimized_text, flags=re.IGNORECASE)
+                optimized_text = _EDUCATION_LINE_RE.sub(skills_section + r'\1', optimized_text)
             else:
                 optimized_text += skills_section
     
     # Enhance summary with keywords
     if missing_keywords:
         keywords_to_add = missing_keywords[:3]  # Add top 3 keywords
-        summary_pattern = r'(\b(?:SUMMARY|OBJECTIVE|PROFILE)\b.*?)(\n\n|\n[A-Z][A-Z]|\Z)'
-        summary_match = re.search(summary_pattern, optimized_text, re.IGNORECASE | re.DOTALL)
+        summary_match = _SUMMARY_SECTION_RE.search(optimized_text)
         if summary_match:
             summary_section = summary_match.group(1)
             enhanced_summary = summary_section.rstrip() + f" Experienced with {', '.join(keywords_to_add)}."
@@ -211,8 +470,11 @@ def apply_optimizations_to_text(original_resume: str, optimization_result: dict)
     
     return optimized_text
 
-def create_docx_resume(resume_text: str, applicant_name: str, optimization_data: dict) -> str:
-    """Create a professional DOCX resume with proper formatting"""
+def create_docx_resume(optimized_text: str, applicant_name: str, optimization_data: dict) -> str:
+    """Create a professional DOCX resume from already-optimized resume text"""
+    from docx import Document
+    from docx.shared import Inches
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
     
     # Create document
     doc = Document()
@@ -225,9 +487,6 @@ def create_docx_resume(resume_text: str, applicant_name: str, optimization_data:
         section.left_margin = Inches(0.7)
         section.right_margin = Inches(0.7)
     
-    # Apply optimizations to get improved content
-    optimized_text = apply_optimizations_to_text(resume_text, optimization_data)
-    
     # Parse the resume content to extract structured sections
     resume_sections = parse_resume_sections(optimized_text)
     
@@ -341,18 +600,14 @@ def create_txt_resume(resume_text: str, applicant_name: str, optimization_data:
 def clean_resume_format(text: str) -> str:
     """Clean up resume formatting for better structure"""
     
-    # Remove excessive whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    # Make sure section headers are on their own line and uppercase (one pass for all headers)
+    text = _SECTION_HEADER_RE.sub(lambda m: f'\n\n{m.group(1).upper()}', text)
     
-    # Ensure section headers are properly formatted
-    section_headers = ['SUMMARY', 'OBJECTIVE', 'EXPERIENCE', 'EDUCATION', 'SKILLS', 'PROJECTS', 'CERTIFICATIONS']
-    for header in section_headers:
-        # Make sure section headers are on their own line and uppercase
-        text = re.sub(rf'\b{header}\b', f'\n\n{header}', text, flags=re.IGNORECASE)
-        text = re.sub(rf'\n\n{header.lower()}\b', f'\n\n{header}', text)
+    # Remove excessive whitespace, including blank lines the header pass just added
+    text = _BLANK_LINES_RE.sub('\n\n', text)
     
     # Clean up multiple spaces
-    text = re.sub(r' {2,}', ' ', text)
+    text = _MULTIPLE_SPACES_RE.sub(' ', text)
     
     # Remove leading/trailing whitespace
     text = text.strip()
@@ -361,50 +616,58 @@ def clean_resume_format(text: str) -> str:
 
 # Upload and process resume file
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    allowed_extensions = ['.pdf', '.docx', '.doc', '.txt']
+async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...), analyze: bool = True) -> dict:
     file_ext = os.path.splitext(file.filename)[1].lower()
     
-    if file_ext not in allowed_extensions:
-        raise HTTPException(400, f"File type not supported. Allowed: {allowed_extensions}")
-    if file.size > 10 * 1024 * 1024:  # 10MB limit
-        raise HTTPException(400, "File too large (max 10MB)")
+    if file_ext not in ALLOWED_EXTENSIONS:
+        raise HTTPException(400, f"File type not supported. Allowed: {sorted(ALLOWED_EXTENSIONS)}")
+    # file.size is client-provided and may be missing; read_upload checks the real bytes
+    if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+        raise HTTPException(413, "File too large (max 10MB)")
+    data = await read_upload(file)
     try:
-        # Save file temporarily
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        upload_dir = "uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        file_path = os.path.join(upload_dir, f"{timestamp}_{file.filename}")
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        # Extract and analyze text
-        text = extract_file_text(file_path, file_ext[1:])
-        analysis = analyzer.analyze_resume(text)
-        return {
+        # Extract and analyze text straight from the uploaded bytes
+        text = await extract_upload_text(data, file_ext[1:])
+        # ?analyze=false returns as soon as the text is extracted; the client
+        # gets the full text and can call /analyze itself
+        analysis = None
+        if analyze:
+            # Regex-heavy analysis would otherwise stall the event loop
+            analysis = await run_in_threadpool(analyzer.analyze_resume, text)
+        
+        # Persist a copy after the response has been sent
+        # A random prefix can't collide between concurrent uploads of the same file
+        file_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}_{file.filename}")
+        background_tasks.add_task(save_upload, file_path, data)
+        
+        response = {
             "success": True,
             "filename": file.filename,
-            "file_size": file.size,
+            "file_size": len(data),
             "text_preview": text[:500] + "..." if len(text) > 500 else text,
             "analysis": analysis,
             "timestamp": datetime.now().isoformat()
         }
+        if not analyze:
+            response["text"] = text
+        return response
     except Exception as e:
-        # Clean up on error
-        if 'file_path' in locals() and os.path.exists(file_path):
-            os.remove(file_path)
         raise HTTPException(500, f"Processing failed: {str(e)}")
 
+# CPU-bound and Watson-calling endpoints are plain `def` so FastAPI runs them
+# in its threadpool instead of blocking the event loop. JSON endpoints declare
+# `-> dict` so FastAPI serializes them with Pydantic's Rust core; returning a
+# Response (the 304s) still bypasses that.
+
 # Analyze resume or job description
 @router.post("/analyze")
-async def analyze_content(request: AnalyzeRequest):
+def analyze_content(request: AnalyzeRequest) -> dict:
     try:
         if request.type == "resume":
             result = analyzer.analyze_resume(request.content)
         else:  # job description
             skills = analyzer.extract_skills(request.content)
-            # Extract requirements
-            exp_matches = re.findall(r'(\d+)\+?\s*years?', request.content, re.IGNORECASE)
-            years_required = max(map(int, exp_matches)) if exp_matches else None
+            years_required = analyzer.extract_experience_years(request.content)
             result = {
                 "skills_required": skills,
                 "years_experience": years_required,
@@ -421,12 +684,17 @@ async def analyze_content(request: AnalyzeRequest):
 
 # Calculate match score between resume and job
 @router.post("/match")
-async def calculate_match(request: MatchRequest):
+def calculate_match(request: MatchRequest, response: Response, if_none_match: Optional[str] = Header(None)) -> dict:
     try:
         result = analyzer.calculate_match_score(
             request.resume,
             request.job_description
         )
+        # Same inputs give the same analysis; let clients revalidate without the body
+        etag = payload_etag(result)
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
         return {
             "success": True,
             "match_analysis": result,
@@ -437,9 +705,9 @@ async def calculate_match(request: MatchRequest):
 
 # Optimize resume for specific job
 @router.post("/optimize")
-async def optimize_resume(request: OptimizeRequest):
+def optimize_resume(request: OptimizeRequest) -> dict:
     try:
-        result = analyzer.optimize_resume(
+        result = cached_optimize_resume(
             request.resume,
             request.job_description
         )
@@ -452,12 +720,30 @@ async def optimize_resume(request: OptimizeRequest):
     except Exception as e:
         raise HTTPException(500, f"Optimization failed: {str(e)}")
 
+# Analyze resume and optimize it for a job in one request
+@router.post("/analyze-and-optimize")
+def analyze_and_optimize(request: OptimizeRequest) -> dict:
+    try:
+        result = analyzer.analyze_and_optimize(
+            request.resume,
+            request.job_description
+        )
+        return {
+            "success": True,
+            "analysis": result['analysis'],
+            "optimization": result['optimization'],
+            "ai_powered": result['optimization'].get('ai_powered', False),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(500, f"Analysis and optimization failed: {str(e)}")
+
 # Generate optimized resume
 @router.post("/generate")
-async def generate_optimized_resume(request: GenerateResumeRequest):
+def generate_optimized_resume(request: GenerateResumeRequest):
     try:
         # Get optimization analysis
-        optimization_result = analyzer.optimize_resume(
+        optimization_result = cached_optimize_resume(
             request.resume,
             request.job_description
         )
@@ -487,16 +773,18 @@ async def generate_optimized_resume(request: GenerateResumeRequest):
 
 # Preview optimized resume
 @router.post("/preview")
-async def preview_optimized_resume(request: OptimizeRequest):
+def preview_optimized_resume(request: OptimizeRequest) -> dict:
     try:
         # Get optimization analysis
-        optimization_result = analyzer.optimize_resume(
+        optimization_result = cached_optimize_resume(
             request.resume,
             request.job_description
         )
         
         # Apply optimizations to create improved resume
         optimized_text = apply_optimizations_to_text(request.resume, optimization_result)
+        skills_added = optimization_result.get('missing_skills', [])[:5]
+        keywords_added = optimization_result.get('missing_keywords', [])[:8]
         
         return {
             "success": True,
@@ -504,8 +792,11 @@ async def preview_optimized_resume(request: OptimizeRequest):
             "optimized_resume": optimized_text,
             "optimization_data": optimization_result,
             "improvements": {
-                "skills_added": optimization_result.get('missing_skills', [])[:5],
-                "keywords_added": optimization_result.get('missing_keywords', [])[:8],
+                "skills_added": skills_added,
+                "keywords_added": keywords_added,
+                # Pre-rendered for the preview UI, which shows the top 5 keywords
+                "skills_added_md": markdown_list(skills_added),
+                "keywords_added_md": markdown_list(keywords_added[:5]),
                 "match_score_improvement": "Estimated +15-25% improvement"
             },
             "timestamp": datetime.now().isoformat()
@@ -515,22 +806,30 @@ async def preview_optimized_resume(request: OptimizeRequest):
 
 # Check system status
 @router.get("/status")
-async def get_status():
-    watson_available = False
+async def get_status(response: Response, if_none_match: Optional[str] = Header(None)) -> dict:
+    status, etag = current_status()
+    # The status rarely changes; pollers revalidate with If-None-Match
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return status
+
+def current_status() -> Tuple[dict, str]:
+    """The /status payload and its ETag, rebuilt at most every STATUS_CACHE_TTL seconds"""
+    global _status_cache
+    now = time.monotonic()
+    if _status_cache is not None and now - _status_cache[0] < STATUS_CACHE_TTL:
+        return _status_cache[1], _status_cache[2]
+    
+    # The analyzer already holds the Watson client (None if it failed to load)
+    client = analyzer.watson_client
+    watson_available = bool(client and client.watson_available)
     model = "fallback_mode"
+    # FIXED: Get actual model from environment variables
+    if watson_available:
+        model = os.getenv("IBM_MODEL_ID", "ibm/granite-13b-instruct-v2")
     
-    try:
-        from watson_client import get_watson_client
-        client = get_watson_client()
-        watson_available = client.watson_available
-        
-        # FIXED: Get actual model from environment variables
-        if watson_available:
-            model = os.getenv("IBM_MODEL_ID", "ibm/granite-13b-instruct-v2")
-    except Exception as e:
-        print(f"Watson client error: {e}")
-    
-    return {
+    status = {
         "status": "operational",
         "version": "2.0.0",
         "features": {
@@ -552,13 +851,18 @@ async def get_status():
             "POST /analyze - Analyze resume or job content",
             "POST /match - Calculate resume-job match score",
             "POST /optimize - Generate optimization suggestions",
+            "POST /analyze-and-optimize - Resume analysis and optimization in one call",
             "POST /generate - Generate optimized resume file",
             "POST /preview - Preview optimized resume",
             "GET /status - System status and capabilities"
         ]
     }
+    
+    etag = payload_etag(status)
+    _status_cache = (now, status, etag)
+    return status, etag
 
 # Health check
 @router.get("/health")
-async def health_check():
+async def health_check() -> dict:
     return {"status": "healthy", "service": "Resume Optimizer API"}
\ No newline at end of file
@@ -1,5 +1,9 @@
 import os
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Dict, Optional
 import requests
 
@@ -13,6 +17,16 @@ except Exception:
 MODEL_ID    = os.getenv("IBM_MODEL_ID", "ibm/granite-13b-instruct-v2")
 API_VERSION = os.getenv("IBM_API_VERSION", "2023-05-29")
 
+# Prompt inputs are truncated to these lengths, so cache keys use the same slices
+RESUME_PROMPT_CHARS = 1500
+JOB_PROMPT_CHARS = 1000
+
+# Successful generations kept per process (LRU)
+RESPONSE_CACHE_SIZE = 1000
+
+# IAM tokens live ~60 minutes; refresh this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 300
+
 class WatsonXClient:    
     def __init__(self, api_key: str = None, url: str = None):
         """
@@ -22,6 +36,15 @@ class WatsonXClient:
             api_key: IBM watsonx.ai API key
             url: IBM watsonx.ai service URL
         """
+        self._response_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # One IAM token and one keep-alive session, shared by every request
+        self._access_token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = threading.Lock()
+        self._session = requests.Session()
+        
         self.api_key = api_key or os.getenv('IBM_WATSON_API_KEY')
         self.url = url or os.getenv('IBM_WATSON_URL', 'https://us-south.ml.cloud.ibm.com')
         
@@ -35,7 +58,13 @@ class WatsonXClient:
     def get_access_token(self) -> Optional[str]:
         if not self.watson_available:
             return None
-            
+        
+        with self._token_lock:
+            if self._access_token and time.time() < self._token_expires_at:
+                return self._access_token
+            return self._request_access_token()
+    
+    def _request_access_token(self) -> Optional[str]:
         try:
             token_url = "https://iam.cloud.ibm.com/identity/token"
             headers = {"Content-Type": "application/x-www-form-urlencoded"}
@@ -49,7 +78,7 @@ class WatsonXClient:
             logging.info(f"Requesting token from: {token_url}")
             logging.info(f"Using API key: {self.api_key[:8]}...")
             
-            response = requests.post(token_url, headers=headers, data=data, timeout=10)
+            response = self._session.post(token_url, headers=headers, data=data, timeout=10)
             
             logging.info(f"Token response status: {response.status_code}")
             
@@ -58,6 +87,8 @@ class WatsonXClient:
                 access_token = token_data.get("access_token")
                 if access_token:
                     logging.info(f"Successfully got access token: {access_token[:20]}...")
+                    self._access_token = access_token
+                    self._token_expires_at = time.time() + token_data.get("expires_in", 3600) - TOKEN_REFRESH_MARGIN
                     return access_token
                 else:
                     logging.error("No access token in response")
@@ -85,6 +116,15 @@ class WatsonXClient:
         if not self.watson_available:
             return self._fallback_optimization(resume_text, job_description)
         
+        # Identical (truncated) inputs produce the same prompt; skip the LLM round-trip
+        cache_key = self._cache_key(resume_text, job_description)
+        with self._cache_lock:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                logging.info("Watson optimization served from cache")
+                return dict(cached)
+        
         try:
             access_token = self.get_access_token()
             if not access_token:
@@ -96,10 +136,10 @@ class WatsonXClient:
             You are an expert resume optimization assistant. Analyze this resume against the job description and provide specific improvements.
 
             RESUME:
-            {resume_text[:1500]}
+            {resume_text[:RESUME_PROMPT_CHARS]}
 
             JOB DESCRIPTION:
-            {job_description[:1000]}
+            {job_description[:JOB_PROMPT_CHARS]}
 
             Provide 3-5 specific optimization suggestions focusing on:
             1. Keywords to add
@@ -132,7 +172,7 @@ class WatsonXClient:
             api_url = f"{self.url}/ml/v1/text/generation?version=2023-05-29"
             logging.info(f"Making Watson API call to: {api_url}")
             
-            response = requests.post(
+            response = self._session.post(
                 api_url,
                 headers=headers,
                 json=payload,
@@ -148,12 +188,14 @@ class WatsonXClient:
                 watson_suggestions = result.get('results', [{}])[0].get('generated_text', '')
                 
                 if watson_suggestions:
-                    return {
+                    optimization = {
                         "success": True,
                         "watson_optimizations": watson_suggestions,
                         "model_used": MODEL_ID,
                         "source": "IBM watsonx.ai"
                     }
+                    self._cache_response(cache_key, optimization)
+                    return optimization
                 else:
                     logging.error("No generated text in Watson response")
                     return self._fallback_optimization(resume_text, job_description)
@@ -165,6 +207,21 @@ class WatsonXClient:
             logging.error(f"Watson optimization error: {str(e)}")
             return self._fallback_optimization(resume_text, job_description)
     
+    def _cache_key(self, resume_text: str, job_description: str) -> str:
+        prompt_inputs = "\0".join((
+            MODEL_ID,
+            resume_text[:RESUME_PROMPT_CHARS],
+            job_description[:JOB_PROMPT_CHARS]
+        ))
+        return hashlib.sha256(prompt_inputs.encode("utf-8")).hexdigest()
+    
+    def _cache_response(self, cache_key: str, optimization: Dict):
+        with self._cache_lock:
+            self._response_cache[cache_key] = dict(optimization)
+            self._response_cache.move_to_end(cache_key)
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+    
     def _fallback_optimization(self, resume_text: str, job_description: str) -> Dict:
         return {
             "success": True,